@@ -1,28 +1,575 @@
 """
 Main orchestrator for the YouTube video processing pipeline.
-Coordinates downloading videos, converting to MP3, fetching transcripts, and writing the dataset CSV.
+Coordinates downloading audio as MP3, fetching transcripts, and writing the dataset.
 Follows Clean Code and Clean Architecture principles.
 """
 
+import asyncio
 import csv
-import json
 import os
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
+import orjson
+from openai import AsyncOpenAI
 from tqdm import tqdm
 
 from src.converter import mp4_to_mp3
-from src.dataset import write_dataset_csv
-from src.downloader import download_video, get_video_id
-from src.qa import generate_qa_pairs
+from src.dataset import open_dataset_writer
+from src.downloader import (
+    download_video,
+    get_legacy_stems,
+    get_video_id,
+    index_downloads,
+    index_legacy_downloads,
+    split_filename,
+)
+from src.qa import a_generate_qa_pairs_many, async_qa_client
 from src.utils import sanitize_transcript
-from src.transcript import get_video_transcript
+from src.transcript import (
+    TRANSCRIPT_SUFFIX,
+    get_video_transcript,
+    read_transcript,
+    write_transcript,
+)
 
-DATASET_CSV_PATH = "dataset/dataset.csv"
+DATASET_PARQUET_PATH = "dataset/dataset.parquet"
 VIDEOS_CSV_PATH = "videos.csv"
 OUTPUT_MP4_DIR = "dataset/output_mp4"
 OUTPUT_MP3_DIR = "dataset/output_mp3"
 OUTPUT_TRANSCRIPTS_DIR = "dataset/output_transcripts"
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_CONVERT_WORKERS = os.cpu_count() or 1
+DEFAULT_TRANSCRIPT_WORKERS = 8
+DEFAULT_QA_WORKERS = 8
+STAGE_QUEUE_SIZE = 4
+PROGRESS_MININTERVAL = 0.5
+PROGRESS_BATCH_SIZE = 16
+
+# A stage item is (row number, payload); a payload of None means the row was dropped.
+StageItem = Tuple[int, Optional[Dict[str, Any]]]
+T = TypeVar("T")
+
+
+class _SharedWork:
+    """
+    Run each keyed call once per pipeline run, even when several stage workers ask
+    for it at the same time. Rows that repeat a video wait for the first row's
+    result instead of downloading or writing the same files concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, "Future[Any]"] = {}
+
+    def run(self, key: Hashable, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Call fn(*args) for the first request of key; later requests get its result.
+        Args:
+            key: Identifies the work, e.g. a video ID.
+            fn: Blocking function to run.
+            args: Arguments for fn.
+        Returns:
+            The result of fn; its exception is raised to every caller if it failed.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if future is None:
+                future = self._futures[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+def load_qa_pairs(qa_pairs_str: str) -> Any:
+    """
+    Parse a serialized qa_pairs value from the input CSV.
+    Args:
+        qa_pairs_str: JSON-encoded Q&A pairs.
+    Returns:
+        The decoded value, or None if it is empty or not a JSON list.
+    """
+    # Rows without Q&A pairs yet are empty strings; skip the JSON parser for them.
+    if not qa_pairs_str or qa_pairs_str[0] != "[":
+        return None
+    try:
+        return orjson.loads(qa_pairs_str)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def is_qa_pairs_valid(qa_pairs: Any) -> bool:
+    """
+    Check whether a decoded qa_pairs value is a non-empty list of Q&A objects.
+    Args:
+        qa_pairs: Value returned by load_qa_pairs.
+    Returns:
+        True if every item has a "question" and an "answer".
+    """
+    return (
+        isinstance(qa_pairs, list)
+        and len(qa_pairs) > 0
+        and all(
+            isinstance(q, dict) and "question" in q and "answer" in q for q in qa_pairs
+        )
+    )
+
+
+def _find_stem(index: Dict[str, str], stems: Tuple[str, ...]) -> Optional[str]:
+    """Return the path of the first stem found in a legacy index."""
+    return next((index[stem] for stem in stems if stem in index), None)
+
+
+def _download_stage(
+    item: Dict[str, Any],
+    audio_output_dir: str,
+    mp3_index: Dict[str, str],
+    mp4_index: Dict[str, str],
+    legacy_mp3_index: Dict[str, str],
+    legacy_mp4_index: Dict[str, str],
+    downloads: _SharedWork,
+    legacy_lookups: _SharedWork,
+) -> Optional[Dict[str, Any]]:
+    """
+    Resolve the MP3 for a CSV row, downloading its audio unless already on disk.
+    Args:
+        item: Pipeline item holding the input CSV row.
+        audio_output_dir: Directory to save downloaded MP3s.
+        mp3_index: Video ID to path of the MP3s already in audio_output_dir.
+        mp4_index: Video ID to path of legacy MP4s that can be converted instead.
+        legacy_mp3_index: Stem to path of MP3s named by title only, as earlier versions did.
+        legacy_mp4_index: Stem to path of MP4s named by title only.
+        downloads: Shares one download between rows with the same video.
+        legacy_lookups: Shares one title lookup between rows with the same video.
+    Returns:
+        The item extended with url, video_id, title, stem, mp4_path and mp3_path, or None if the row has no URL.
+    """
+    url = item["row"].get("url", "").strip()
+    if not url:
+        return None
+    video_id = get_video_id(url)
+    mp3_path = mp3_index.get(video_id) if video_id else None
+    mp4_path = None
+    if not mp3_path:
+        mp4_path = mp4_index.get(video_id) if video_id else None
+    if not mp3_path and not mp4_path and (legacy_mp3_index or legacy_mp4_index):
+        stems = legacy_lookups.run(url, get_legacy_stems, url)
+        mp3_path = _find_stem(legacy_mp3_index, stems)
+        mp4_path = None if mp3_path else _find_stem(legacy_mp4_index, stems)
+    if not mp3_path and not mp4_path:
+        mp3_path = downloads.run(video_id or url, download_video, url, audio_output_dir)
+    stem = os.path.splitext(os.path.basename(mp3_path or mp4_path or ""))[0]
+    if mp4_path:
+        mp3_path = os.path.join(audio_output_dir, f"{stem}.mp3")
+    title = split_filename(stem)[0] if stem else ""
+
+    item.update(
+        url=url,
+        video_id=video_id,
+        title=title,
+        stem=stem,
+        mp4_path=mp4_path,
+        mp3_path=mp3_path,
+    )
+    return item
+
+
+def _convert_stage(item: Dict[str, Any], conversions: _SharedWork) -> Dict[str, Any]:
+    """
+    Convert a legacy MP4 to MP3; a no-op for audio downloaded directly as MP3.
+    Args:
+        item: Pipeline item produced by the download stage.
+        conversions: Shares one conversion between rows with the same MP4.
+    Returns:
+        The item, unchanged.
+    """
+    # The download stage only sets mp4_path when no MP3 was indexed for the video.
+    mp4_path = item["mp4_path"]
+    mp3_path = item["mp3_path"]
+    if mp4_path:
+        try:
+            conversions.run(mp4_path, mp4_to_mp3, mp4_path, mp3_path)
+        except Exception as e:
+            print(f"Error converting {mp4_path} to MP3: {e}")
+    return item
+
+
+def _save_transcript(video_id: str, transcript_path: str) -> Optional[str]:
+    """
+    Fetch a transcript and save it.
+    Args:
+        video_id: The YouTube video ID.
+        transcript_path: Destination file path.
+    Returns:
+        transcript_path, or None if the transcript could not be fetched or saved.
+    """
+    transcript = get_video_transcript(video_id)
+    if not transcript:
+        return None
+    try:
+        write_transcript(transcript_path, transcript)
+    except Exception as e:
+        print(f"Error saving transcript for {video_id}: {e}")
+        return None
+    return transcript_path
+
+
+def _transcript_stage(
+    item: Dict[str, Any],
+    transcript_output_dir: str,
+    transcript_index: Dict[str, str],
+    legacy_transcript_index: Dict[str, str],
+    transcripts: _SharedWork,
+    legacy_lookups: _SharedWork,
+) -> Dict[str, Any]:
+    """
+    Fetch or load the transcript and build the dataset row.
+    Args:
+        item: Pipeline item produced by the convert stage.
+        transcript_output_dir: Directory to save transcripts.
+        transcript_index: Video ID to path of the transcripts already in transcript_output_dir.
+        legacy_transcript_index: Stem to path of transcripts named by title only.
+        transcripts: Shares one fetch between rows with the same video.
+        legacy_lookups: Shares one title lookup between rows with the same video.
+    Returns:
+        The dataset row for this video, with qa_pairs None when they still need generating.
+    """
+    row = item["row"]
+    video_id = item["video_id"]
+    title = item["title"]
+    stem = item["stem"]
+    transcript_path = transcript_index.get(video_id) if video_id else None
+    transcript = None
+    transcript_exists = False
+
+    if not transcript_path and legacy_transcript_index:
+        stems = legacy_lookups.run(item["url"], get_legacy_stems, item["url"])
+        transcript_path = _find_stem(legacy_transcript_index, stems)
+    # Without a stem (failed download) there is nowhere to save it, and an unsaved
+    # transcript is left out of the row anyway.
+    if not transcript_path and video_id and stem:
+        transcript_path = transcripts.run(
+            video_id,
+            _save_transcript,
+            video_id,
+            os.path.join(transcript_output_dir, f"{stem}{TRANSCRIPT_SUFFIX}"),
+        )
+    if transcript_path:
+        try:
+            transcript = read_transcript(transcript_path)
+            transcript_exists = True
+        except Exception as e:
+            print(f"Error reading transcript for {video_id}: {e}")
+
+    if transcript:
+        transcript = sanitize_transcript(transcript)
+
+    # None marks rows whose Q&A pairs are left to the Q&A stage.
+    qa_pairs: Optional[List[Dict[str, str]]] = load_qa_pairs(row.get("qa_pairs", ""))
+    if not is_qa_pairs_valid(qa_pairs):
+        qa_pairs = None if transcript and transcript_exists else []
+
+    return {
+        "url": item["url"],
+        "video_id": video_id or "",
+        "title": title or "",
+        "mp4_path": item["mp4_path"] or "",
+        "mp3_path": item["mp3_path"] or "",
+        "transcript_path": transcript_path if transcript_exists else "",
+        "transcript_exists": transcript_exists,
+        "transcript": transcript if transcript_exists else "",
+        "qa_pairs": qa_pairs,
+    }
+
+
+def _serialize_qa_pairs(dataset_row: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the row's Q&A pairs list with its JSON encoding for the CSV."""
+    dataset_row["qa_pairs"] = orjson.dumps(dataset_row["qa_pairs"]).decode("utf-8")
+    return dataset_row
+
+
+async def _stage_worker(
+    fn: Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]],
+    inbox: "asyncio.Queue[Optional[StageItem]]",
+    outbox: "asyncio.Queue[Optional[StageItem]]",
+) -> None:
+    """Apply fn to items from inbox and forward them to outbox until a None sentinel arrives."""
+    while (item := await inbox.get()) is not None:
+        index, payload = item
+        if payload is not None:
+            try:
+                payload = await fn(payload)
+            except Exception as e:
+                url = payload["row"].get("url", "")
+                print(f"Error processing row {index} ({url}): {e}")
+                payload = None
+        await outbox.put((index, payload))
+
+
+async def _run_stage(
+    worker: Callable[[], Awaitable[None]],
+    workers: int,
+    outbox: "asyncio.Queue[Optional[StageItem]]",
+    downstream_workers: int,
+) -> None:
+    """
+    Run a pool of stage workers until each has seen its sentinel,
+    then send one sentinel per downstream worker, even if a worker failed.
+    """
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        for _ in range(downstream_workers):
+            await outbox.put(None)
+
+
+def _in_executor(
+    executor: ThreadPoolExecutor, fn: Callable[[Dict[str, Any]], Any]
+) -> Callable[[Dict[str, Any]], Awaitable[Any]]:
+    """Wrap a blocking stage function so it runs on the thread pool without blocking the event loop."""
+
+    async def run(payload: Dict[str, Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, payload)
+
+    return run
+
+
+async def _qa_worker(
+    inbox: "asyncio.Queue[Optional[StageItem]]",
+    outbox: "asyncio.Queue[Optional[StageItem]]",
+    qa: Optional[Tuple[AsyncOpenAI, str]],
+    batch_size: int,
+) -> None:
+    """
+    Fill in Q&A pairs for rows that need them, sending up to batch_size
+    transcripts that are already waiting in one request.
+    """
+    stopped = False
+    while not stopped and (item := await inbox.get()) is not None:
+        batch = [item]
+        while len(batch) < batch_size and not inbox.empty():
+            if (item := inbox.get_nowait()) is None:
+                stopped = True
+                break
+            batch.append(item)
+
+        pending = [
+            row for _, row in batch if row is not None and row["qa_pairs"] is None
+        ]
+        generated: List[List[Dict[str, str]]] = [[] for _ in pending]
+        if pending and qa is not None:
+            client, model = qa
+            try:
+                generated = await a_generate_qa_pairs_many(
+                    client,
+                    model,
+                    [row["transcript"] for row in pending],
+                    num_pairs=5,
+                    batch_size=len(pending),
+                )
+            except Exception as e:
+                print(f"Error generating Q&A pairs: {e}")
+        for row, qa_pairs in zip(pending, generated):
+            row["qa_pairs"] = qa_pairs
+
+        for item in batch:
+            await outbox.put(item)
+
+
+def _count_csv_rows(csv_path: str) -> int:
+    """
+    Cheaply estimate the data rows of a CSV file for progress reporting.
+    Counts non-blank lines minus the header, since csv.DictReader skips blank
+    lines; a quoted field spanning several lines still counts more than once.
+    """
+    with open(csv_path, "rb") as f:
+        return max(0, sum(1 for line in f if line.strip()) - 1)
+
+
+async def _feed_rows(
+    csv_path: str,
+    inbox: "asyncio.Queue[Optional[StageItem]]",
+    workers: int,
+) -> None:
+    """Stream CSV rows into the first stage queue, then send one sentinel per worker."""
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as csvfile:
+            for index, row in enumerate(csv.DictReader(csvfile)):
+                await inbox.put((index, {"row": row}))
+    finally:
+        for _ in range(workers):
+            await inbox.put(None)
+
+
+async def a_process_videos_from_csv(
+    csv_path: str,
+    video_output_dir: str,
+    audio_output_dir: str,
+    transcript_output_dir: str,
+    dataset_path: str,
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    convert_workers: int = DEFAULT_CONVERT_WORKERS,
+    transcript_workers: int = DEFAULT_TRANSCRIPT_WORKERS,
+    qa_workers: int = DEFAULT_QA_WORKERS,
+    qa_batch_size: int = 1,
+) -> str:
+    """
+    Async implementation of process_videos_from_csv; see there for the arguments.
+
+    Each stage is a pool of asyncio tasks with its own worker count, connected to the
+    next by a bounded asyncio.Queue. Blocking calls (yt-dlp, ffmpeg, transcript API)
+    run on a shared thread pool; Q&A generation uses the async OpenAI client.
+    """
+    os.makedirs(audio_output_dir, exist_ok=True)
+    os.makedirs(transcript_output_dir, exist_ok=True)
+
+    total = _count_csv_rows(csv_path)
+    download_workers = max(1, download_workers)
+    convert_workers = max(1, convert_workers)
+    transcript_workers = max(1, transcript_workers)
+    qa_workers = max(1, qa_workers)
+    download_queue: "asyncio.Queue[Optional[StageItem]]" = asyncio.Queue(
+        STAGE_QUEUE_SIZE
+    )
+    convert_queue: "asyncio.Queue[Optional[StageItem]]" = asyncio.Queue(
+        STAGE_QUEUE_SIZE
+    )
+    transcript_queue: "asyncio.Queue[Optional[StageItem]]" = asyncio.Queue(
+        STAGE_QUEUE_SIZE
+    )
+    # Q&A workers batch the rows already waiting, so the queue must hold a full batch.
+    qa_queue: "asyncio.Queue[Optional[StageItem]]" = asyncio.Queue(
+        max(STAGE_QUEUE_SIZE, qa_batch_size)
+    )
+    done_queue: "asyncio.Queue[Optional[StageItem]]" = asyncio.Queue()
+
+    # Files saved by earlier versions are named by title only; their video is
+    # matched by looking up its title, which only happens when such files exist.
+    legacy_lookups = _SharedWork()
+    download = partial(
+        _download_stage,
+        audio_output_dir=audio_output_dir,
+        mp3_index=index_downloads(audio_output_dir, ".mp3"),
+        mp4_index=index_downloads(video_output_dir, ".mp4"),
+        legacy_mp3_index=index_legacy_downloads(audio_output_dir, ".mp3"),
+        legacy_mp4_index=index_legacy_downloads(video_output_dir, ".mp4"),
+        downloads=_SharedWork(),
+        legacy_lookups=legacy_lookups,
+    )
+    convert = partial(_convert_stage, conversions=_SharedWork())
+    # Transcripts saved by earlier versions are uncompressed .txt files.
+    transcript = partial(
+        _transcript_stage,
+        transcript_output_dir=transcript_output_dir,
+        transcript_index={
+            **index_downloads(transcript_output_dir, ".txt"),
+            **index_downloads(transcript_output_dir, TRANSCRIPT_SUFFIX),
+        },
+        legacy_transcript_index={
+            **index_legacy_downloads(transcript_output_dir, ".txt"),
+            **index_legacy_downloads(transcript_output_dir, TRANSCRIPT_SUFFIX),
+        },
+        transcripts=_SharedWork(),
+        legacy_lookups=legacy_lookups,
+    )
+
+    with ThreadPoolExecutor(
+        max_workers=download_workers + convert_workers + transcript_workers
+    ) as executor:
+        async with async_qa_client() as qa:
+            stages = asyncio.gather(
+                _feed_rows(csv_path, download_queue, download_workers),
+                _run_stage(
+                    partial(
+                        _stage_worker,
+                        _in_executor(executor, download),
+                        download_queue,
+                        convert_queue,
+                    ),
+                    download_workers,
+                    convert_queue,
+                    convert_workers,
+                ),
+                _run_stage(
+                    partial(
+                        _stage_worker,
+                        _in_executor(executor, convert),
+                        convert_queue,
+                        transcript_queue,
+                    ),
+                    convert_workers,
+                    transcript_queue,
+                    transcript_workers,
+                ),
+                _run_stage(
+                    partial(
+                        _stage_worker,
+                        _in_executor(executor, transcript),
+                        transcript_queue,
+                        qa_queue,
+                    ),
+                    transcript_workers,
+                    qa_queue,
+                    qa_workers,
+                ),
+                _run_stage(
+                    partial(_qa_worker, qa_queue, done_queue, qa, qa_batch_size),
+                    qa_workers,
+                    done_queue,
+                    1,
+                ),
+            )
+
+            # The writer consumes the last queue; rows are written as they complete.
+            try:
+                with open_dataset_writer(dataset_path) as writer:
+                    with tqdm(
+                        total=total,
+                        desc="Processing videos",
+                        unit="video",
+                        mininterval=PROGRESS_MININTERVAL,
+                        smoothing=0.1,
+                    ) as pbar:
+                        unreported = 0
+                        while (item := await done_queue.get()) is not None:
+                            _, dataset_row = item
+                            if dataset_row is not None:
+                                writer.write(_serialize_qa_pairs(dataset_row))
+                            # Report in batches while cached rows stream through.
+                            unreported += 1
+                            if unreported >= PROGRESS_BATCH_SIZE or done_queue.empty():
+                                pbar.update(unreported)
+                                unreported = 0
+                        pbar.update(unreported)
+                        # Correct the estimate if multi-line fields inflated it.
+                        if pbar.n != pbar.total:
+                            pbar.total = pbar.n
+                            pbar.refresh()
+            except BaseException:
+                stages.cancel()
+                await asyncio.gather(stages, return_exceptions=True)
+                raise
+            await stages
+    return writer.path
 
 
 def process_videos_from_csv(
@@ -30,151 +577,67 @@ def process_videos_from_csv(
     video_output_dir: str,
     audio_output_dir: str,
     transcript_output_dir: str,
-    dataset_csv_path: str,
+    dataset_path: str,
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    convert_workers: int = DEFAULT_CONVERT_WORKERS,
+    transcript_workers: int = DEFAULT_TRANSCRIPT_WORKERS,
+    qa_workers: int = DEFAULT_QA_WORKERS,
+    qa_batch_size: int = 1,
 ) -> str:
     """
     Process YouTube videos listed in a CSV file:
-    - Download videos
-    - Convert to MP3
+    - Download audio as MP3 (legacy MP4s on disk are converted instead)
     - Fetch and sanitize transcripts
     - Generate Q&A pairs
-    - Write results to a dataset CSV
+    - Stream results to a dataset Parquet or CSV file
+
+    The four stages run concurrently with their own worker counts, so throughput is
+    bounded by the slowest stage rather than the sum of all of them. Rows are written
+    in completion order.
 
     Args:
         csv_path: Path to input CSV with YouTube URLs.
-        video_output_dir: Directory to save downloaded MP4s.
-        audio_output_dir: Directory to save converted MP3s.
+        video_output_dir: Directory of previously downloaded MP4s.
+        audio_output_dir: Directory to save MP3s.
         transcript_output_dir: Directory to save transcripts.
-        dataset_csv_path: Path to output dataset CSV.
+        dataset_path: Path to the output dataset; ".parquet" writes Parquet, anything else CSV.
+        download_workers: Number of concurrent yt-dlp downloads.
+        convert_workers: Number of concurrent legacy MP4 to MP3 conversions.
+        transcript_workers: Number of concurrent transcript fetches.
+        qa_workers: Number of concurrent Q&A generation requests.
+        qa_batch_size: Maximum number of transcripts sent to the model in a single prompt;
+            rows are batched as they queue up behind slow requests, and batches that
+            would overflow the model's limits are split (see src.qa.max_batch_size).
     Returns:
-        Path to the generated dataset CSV.
+        Path to the generated dataset.
     """
-    dataset_rows: List[Dict[str, Any]] = []
-    os.makedirs(video_output_dir, exist_ok=True)
-    os.makedirs(audio_output_dir, exist_ok=True)
-    os.makedirs(transcript_output_dir, exist_ok=True)
-
-    with open(csv_path, newline="", encoding="utf-8") as csvfile:
-        reader = list(csv.DictReader(csvfile))
-        for row in tqdm(reader, desc="Processing videos", unit="video"):
-            url = row.get("url", "").strip()
-            if not url:
-                continue
-            video_id = get_video_id(url)
-            title = None
-            mp4_path = None
-            mp3_path = None
-            transcript_path = None
-            transcript = None
-            transcript_exists = False
-
-            if video_id:
-                possible_mp4s = [
-                    f
-                    for f in os.listdir(video_output_dir)
-                    if f.endswith(".mp4") and video_id in f
-                ]
-                if possible_mp4s:
-                    mp4_path = os.path.join(video_output_dir, possible_mp4s[0])
-                    title = os.path.splitext(os.path.basename(mp4_path))[0]
-                else:
-                    mp4_path = download_video(url, video_output_dir)
-                    title = (
-                        os.path.splitext(os.path.basename(mp4_path))[0]
-                        if mp4_path
-                        else ""
-                    )
-            else:
-                mp4_path = download_video(url, video_output_dir)
-                title = (
-                    os.path.splitext(os.path.basename(mp4_path))[0] if mp4_path else ""
-                )
-
-            mp3_path = os.path.join(audio_output_dir, f"{title}.mp3") if title else ""
-            transcript_path = (
-                os.path.join(transcript_output_dir, f"{title}.txt") if title else ""
-            )
-
-            if mp4_path and os.path.exists(mp4_path):
-                if not (mp3_path and os.path.exists(mp3_path)):
-                    try:
-                        mp4_to_mp3(mp4_path, mp3_path)
-                    except Exception as e:
-                        print(f"Error converting {mp4_path} to MP3: {e}")
-
-            if transcript_path and os.path.exists(transcript_path):
-                try:
-                    with open(transcript_path, "r", encoding="utf-8") as f:
-                        transcript = f.read()
-                    transcript_exists = True
-                except Exception as e:
-                    print(f"Error reading transcript for {video_id}: {e}")
-            elif video_id:
-                transcript = get_video_transcript(video_id)
-                if transcript:
-                    try:
-                        with open(transcript_path, "w", encoding="utf-8") as f:
-                            f.write(transcript)
-                        transcript_exists = True
-                    except Exception as e:
-                        print(f"Error saving transcript for {video_id}: {e}")
-
-            if transcript:
-                transcript = sanitize_transcript(transcript)
-
-            def is_qa_pairs_valid(qa_pairs_str: str) -> bool:
-                try:
-                    qa_pairs = json.loads(qa_pairs_str)
-                    return (
-                        isinstance(qa_pairs, list)
-                        and len(qa_pairs) > 0
-                        and all(
-                            isinstance(q, dict) and "question" in q and "answer" in q
-                            for q in qa_pairs
-                        )
-                    )
-                except Exception:
-                    return False
-
-            qa_pairs_str = row.get("qa_pairs", "")
-            needs_qa = not is_qa_pairs_valid(qa_pairs_str)
-            qa_pairs = []
-            if not needs_qa:
-                try:
-                    qa_pairs = json.loads(qa_pairs_str)
-                except Exception:
-                    qa_pairs = []
-            elif transcript and transcript_exists:
-                qa_pairs = generate_qa_pairs(transcript, num_pairs=5)
-
-            dataset_rows.append(
-                {
-                    "url": url,
-                    "video_id": video_id or "",
-                    "title": title or "",
-                    "mp4_path": mp4_path or "",
-                    "mp3_path": mp3_path or "",
-                    "transcript_path": transcript_path if transcript_exists else "",
-                    "transcript_exists": transcript_exists,
-                    "transcript": transcript if transcript_exists else "",
-                    "qa_pairs": json.dumps(qa_pairs, ensure_ascii=False),
-                }
-            )
-
-    return write_dataset_csv(dataset_rows, dataset_csv_path)
+    return asyncio.run(
+        a_process_videos_from_csv(
+            csv_path,
+            video_output_dir,
+            audio_output_dir,
+            transcript_output_dir,
+            dataset_path,
+            download_workers=download_workers,
+            convert_workers=convert_workers,
+            transcript_workers=transcript_workers,
+            qa_workers=qa_workers,
+            qa_batch_size=qa_batch_size,
+        )
+    )
 
 
 def main() -> None:
     """Entry point for the YouTube video processing pipeline."""
-    os.makedirs(os.path.dirname(DATASET_CSV_PATH), exist_ok=True)
-    result_csv_path = process_videos_from_csv(
+    os.makedirs(os.path.dirname(DATASET_PARQUET_PATH), exist_ok=True)
+    result_path = process_videos_from_csv(
         csv_path=VIDEOS_CSV_PATH,
         video_output_dir=OUTPUT_MP4_DIR,
         audio_output_dir=OUTPUT_MP3_DIR,
         transcript_output_dir=OUTPUT_TRANSCRIPTS_DIR,
-        dataset_csv_path=DATASET_CSV_PATH,
+        dataset_path=DATASET_PARQUET_PATH,
     )
-    print(f"Dataset CSV generated at: {result_csv_path}")
+    print(f"Dataset generated at: {result_path}")
 
 
 if __name__ == "__main__":
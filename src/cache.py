@@ -0,0 +1,10 @@
+"""On-disk cache shared by the network-bound modules."""
+
+import os
+
+from diskcache import Cache
+
+CACHE_DIR = os.getenv("YT_CACHE_DIR", ".cache/yt")
+CACHE_EXPIRE = 7 * 86400
+
+cache = Cache(CACHE_DIR)
@@ -1,5 +1,33 @@
 """MP4 to MP3 conversion logic."""
 
+import shutil
+import subprocess
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_exe() -> str:
+    """
+    Locate the ffmpeg executable.
+    Returns:
+        The ffmpeg on PATH, falling back to the binary bundled with imageio-ffmpeg.
+    """
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def _run_ffmpeg(*args: str) -> None:
+    """Run ffmpeg with the given arguments, raising CalledProcessError on failure."""
+    subprocess.run(
+        [get_ffmpeg_exe(), "-y", "-loglevel", "error", *args],
+        check=True,
+        stdin=subprocess.DEVNULL,
+    )
+
 
 def mp4_to_mp3(mp4_path: str, mp3_path: str) -> None:
     """
@@ -8,8 +36,4 @@ def mp4_to_mp3(mp4_path: str, mp3_path: str) -> None:
         mp4_path: Path to the input MP4 file.
         mp3_path: Path to the output MP3 file.
     """
-    from moviepy import VideoFileClip
-
-    with VideoFileClip(mp4_path) as video:
-        if video.audio is not None:
-            video.audio.write_audiofile(mp3_path, codec="mp3")
+    _run_ffmpeg("-i", mp4_path, "-vn", "-acodec", "libmp3lame", "-q:a", "2", mp3_path)
@@ -1,8 +1,72 @@
-"""Dataset CSV processing logic."""
+"""Dataset CSV and Parquet writing logic."""
 
 import csv
 import os
-from typing import Dict, List
+from types import TracebackType
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Type, Union
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+FIELDNAMES = (
+    "url",
+    "video_id",
+    "title",
+    "mp4_path",
+    "mp3_path",
+    "transcript_path",
+    "transcript_exists",
+    "transcript",
+    "qa_pairs",
+)
+# Rows carry whole transcripts, so a large buffer saves many small write() calls.
+WRITE_BUFFER_SIZE = 1 << 20
+PARQUET_ROW_GROUP_SIZE = 256
+
+
+class DatasetWriter:
+    """
+    Stream dataset rows to a CSV file as they are produced.
+    Use as a context manager; the header is written on enter and the file closed on exit.
+    """
+
+    def __init__(self, dataset_csv_path: str, buffer_size: int = WRITE_BUFFER_SIZE):
+        self.path = dataset_csv_path
+        self._buffer_size = buffer_size
+
+    def __enter__(self) -> "DatasetWriter":
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(
+            self.path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=self._buffer_size,
+        )
+        self._writer = csv.writer(
+            self._file,
+            quoting=csv.QUOTE_ALL,
+            escapechar="\\",
+            doublequote=True,
+        )
+        self._writer.writerow(FIELDNAMES)
+        return self
+
+    def write(self, row: Mapping[str, object]) -> None:
+        """
+        Append one dataset row; missing fields are written as empty strings.
+        Args:
+            row: Mapping of field name to value.
+        """
+        self._writer.writerow(tuple(row.get(field, "") for field in FIELDNAMES))
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._file.close()
 
 
 def write_dataset_csv(
@@ -16,27 +80,128 @@ def write_dataset_csv(
     Returns:
         The path to the written CSV file.
     """
-    os.makedirs(os.path.dirname(dataset_csv_path), exist_ok=True)
-    fieldnames = [
-        "url",
-        "video_id",
-        "title",
-        "mp4_path",
-        "mp3_path",
-        "transcript_path",
-        "transcript_exists",
-        "transcript",
-        "qa_pairs",
-    ]
-    with open(dataset_csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=fieldnames,
-            quoting=csv.QUOTE_ALL,
-            escapechar="\\",
-            doublequote=True,
+    with DatasetWriter(dataset_csv_path) as writer:
+        for row in dataset_rows:
+            writer.write(row)
+    return dataset_csv_path
+
+
+def _parquet_schema() -> "pa.Schema":
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            (field, pa.bool_() if field == "transcript_exists" else pa.string())
+            for field in FIELDNAMES
+        ]
+    )
+
+
+class ParquetDatasetWriter:
+    """
+    Stream dataset rows to a zstd-compressed Parquet file.
+    Rows are buffered and flushed as one row group every row_group_size rows.
+    Use as a context manager, like DatasetWriter.
+    """
+
+    def __init__(
+        self, dataset_parquet_path: str, row_group_size: int = PARQUET_ROW_GROUP_SIZE
+    ):
+        self.path = dataset_parquet_path
+        self._row_group_size = row_group_size
+        self._rows: List[Mapping[str, object]] = []
+
+    def __enter__(self) -> "ParquetDatasetWriter":
+        import pyarrow.parquet as pq
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._schema = _parquet_schema()
+        self._writer = pq.ParquetWriter(
+            self.path, self._schema, compression="zstd", use_dictionary=True
         )
-        writer.writeheader()
+        return self
+
+    def write(self, row: Mapping[str, object]) -> None:
+        """
+        Append one dataset row; missing fields are written as nulls.
+        Args:
+            row: Mapping of field name to value.
+        """
+        self._rows.append(row)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        if self._rows:
+            table = pa.Table.from_pylist(self._rows, schema=self._schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+def open_dataset_writer(
+    dataset_path: str,
+) -> Union[DatasetWriter, ParquetDatasetWriter]:
+    """
+    Pick the dataset writer matching the output file extension.
+    Args:
+        dataset_path: Path to the output dataset, ending in ".parquet" or ".csv".
+    Returns:
+        A ParquetDatasetWriter for ".parquet" paths, else a CSV DatasetWriter.
+    """
+    if dataset_path.endswith(".parquet"):
+        return ParquetDatasetWriter(dataset_path)
+    return DatasetWriter(dataset_path)
+
+
+def write_dataset_parquet(
+    dataset_rows: List[Dict[str, object]], dataset_parquet_path: str
+) -> str:
+    """
+    Write a list of dataset rows to a Parquet file.
+    Args:
+        dataset_rows: List of dictionaries containing dataset information.
+        dataset_parquet_path: Path to the output Parquet file.
+    Returns:
+        The path to the written Parquet file.
+    """
+    with ParquetDatasetWriter(dataset_parquet_path) as writer:
         for row in dataset_rows:
-            writer.writerow(row)
+            writer.write(row)
+    return dataset_parquet_path
+
+
+def parquet_to_csv(dataset_parquet_path: str, dataset_csv_path: str) -> str:
+    """
+    Convert a Parquet dataset to the CSV format, one row group at a time.
+    Args:
+        dataset_parquet_path: Path to the input Parquet file.
+        dataset_csv_path: Path to the output CSV file.
+    Returns:
+        The path to the written CSV file.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(dataset_parquet_path)
+    with DatasetWriter(dataset_csv_path) as writer:
+        for batch in parquet_file.iter_batches():
+            for row in batch.to_pylist():
+                writer.write(
+                    {
+                        field: "" if value is None else value
+                        for field, value in row.items()
+                    }
+                )
     return dataset_csv_path
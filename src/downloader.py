@@ -1,6 +1,20 @@
 """YouTube video downloading logic."""
 
-from typing import Optional
+import os
+import re
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.cache import CACHE_EXPIRE, cache
+from src.converter import get_ffmpeg_exe
+
+# yt-dlp's default naming; the bracketed id lets cached files be matched exactly.
+OUTPUT_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+# Naming used by earlier versions, before filenames carried the video ID.
+LEGACY_OUTPUT_TEMPLATE = "%(title)s.%(ext)s"
+_URL_ID_RE = re.compile(r"(?:youtube\.com/watch\?(?:[^#]*&)?v=|youtu\.be/)([\w-]{11})")
+_FILENAME_ID_RE = re.compile(r"^(.*) \[([\w-]{11})\]$")
+# Subset of the yt-dlp info dict needed to rebuild the output filename.
+_INFO_CACHE_FIELDS = ("id", "title", "ext")
 
 
 def get_video_id(url: str) -> Optional[str]:
@@ -11,35 +25,169 @@ def get_video_id(url: str) -> Optional[str]:
     Returns:
         The video ID if found, else None.
     """
-    if "youtube.com/watch?v=" in url:
-        return url.split("v=")[-1].split("&")[0]
-    if "youtu.be/" in url:
-        return url.split("youtu.be/")[-1].split("?")[0]
-    return None
+    match = _URL_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def split_filename(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a file named after OUTPUT_TEMPLATE into its title and video ID.
+    Args:
+        path: Path or filename of a downloaded file.
+    Returns:
+        (title, video_id); video_id is None and title is the bare stem if the name does not match.
+    """
+    return _split_stem(os.path.splitext(os.path.basename(path))[0])
+
+
+def _split_stem(stem: str) -> Tuple[str, Optional[str]]:
+    match = _FILENAME_ID_RE.match(stem)
+    if match:
+        return match.group(1), match.group(2)
+    return stem, None
 
 
-def download_video(url: str, output_dir: str) -> Optional[str]:
+def _scan_stems(output_dir: str, ext: str) -> Iterator[Tuple[str, str]]:
+    """Yield (stem, path) for the files with the given extension in a directory."""
+    if not os.path.isdir(output_dir):
+        return
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(ext) and entry.is_file():
+                yield entry.name[: -len(ext)], entry.path
+
+
+def index_downloads(output_dir: str, ext: str) -> Dict[str, str]:
     """
-    Download a YouTube video to the specified output directory.
+    Map video IDs to the files with the given extension in a directory, in one scan.
+    Args:
+        output_dir: Directory to scan.
+        ext: File extension to index, including the dot (e.g. ".mp4" or ".txt.zst").
+    Returns:
+        A dict of video ID to file path; empty if the directory does not exist.
+    """
+    index: Dict[str, str] = {}
+    for stem, path in _scan_stems(output_dir, ext):
+        _, video_id = _split_stem(stem)
+        if video_id:
+            index.setdefault(video_id, path)
+    return index
+
+
+def index_legacy_downloads(output_dir: str, ext: str) -> Dict[str, str]:
+    """
+    Map stems to the files named without a video ID, as earlier versions saved them.
+    Args:
+        output_dir: Directory to scan.
+        ext: File extension to index, including the dot.
+    Returns:
+        A dict of stem to file path; empty if the directory does not exist.
+    """
+    return {
+        stem: path
+        for stem, path in _scan_stems(output_dir, ext)
+        if _split_stem(stem)[1] is None
+    }
+
+
+def _info_cache_key(url: str) -> Tuple[str, str]:
+    """Cache key for the yt-dlp metadata of a URL."""
+    return ("yt-dlp-info", url)
+
+
+def _mp3_path(path: str) -> str:
+    """Path of the MP3 that FFmpegExtractAudio produces from a downloaded file."""
+    return os.path.splitext(path)[0] + ".mp3"
+
+
+def _get_info(ydl: Any, url: str) -> Optional[Dict[str, Any]]:
+    """Return the cached metadata of a URL, fetching it without downloading if missing."""
+    info = cache.get(_info_cache_key(url))
+    if not info:
+        info = ydl.extract_info(url, download=False)
+        if info:
+            info = _cache_info(url, info)
+    return info
+
+
+def _cache_info(url: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache the subset of a yt-dlp info dict needed to rebuild filenames."""
+    cached = {field: info.get(field) for field in _INFO_CACHE_FIELDS}
+    cache.set(_info_cache_key(url), cached, expire=CACHE_EXPIRE, tag="info")
+    return cached
+
+
+def get_legacy_stems(url: str) -> Tuple[str, ...]:
+    """
+    Return the stems earlier versions gave to the files of a video: yt-dlp's
+    sanitized title for the MP4, the raw title for the MP3 and transcript.
+    Uses the cached metadata when available, else one request without downloading.
     Args:
         url: The YouTube video URL.
-        output_dir: Directory to save the downloaded video.
     Returns:
-        The path to the downloaded video file, or None if failed.
+        The distinct stems, or an empty tuple if the metadata could not be fetched.
     """
-    import os
+    import yt_dlp
+
+    try:
+        with yt_dlp.YoutubeDL(
+            {"outtmpl": LEGACY_OUTPUT_TEMPLATE, "quiet": True, "retries": 10}
+        ) as ydl:
+            info = _get_info(ydl, url)
+            if not info or not info.get("title"):
+                return ()
+            sanitized = os.path.splitext(ydl.prepare_filename(info))[0]
+            return tuple(dict.fromkeys((sanitized, info["title"])))
+    except Exception as e:
+        print(f"Error fetching metadata for {url}: {e}")
+    return ()
+
 
+def download_video(
+    url: str, output_dir: str, force_refresh: bool = False
+) -> Optional[str]:
+    """
+    Download the audio of a YouTube video as MP3 to the specified output directory.
+    yt-dlp fetches the best audio stream and converts it with ffmpeg in one pass.
+    The video metadata is cached on disk, so a video whose MP3 already exists is
+    resolved without contacting YouTube.
+    Args:
+        url: The YouTube video URL.
+        output_dir: Directory to save the MP3.
+        force_refresh: Ignore any cached metadata and query YouTube again.
+    Returns:
+        The path to the MP3 file, or None if failed.
+    """
     import yt_dlp
 
     os.makedirs(output_dir, exist_ok=True)
-    outtmpl = os.path.join(output_dir, "%(title)s.%(ext)s")
-    ydl_opts = {"format": "best", "outtmpl": outtmpl, "quiet": True}
+    outtmpl = os.path.join(output_dir, OUTPUT_TEMPLATE)
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "outtmpl": outtmpl,
+        "postprocessors": [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }
+        ],
+        "ffmpeg_location": get_ffmpeg_exe(),
+        "quiet": True,
+        "retries": 10,
+        "fragment_retries": 10,
+    }
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            if info and "title" in info and "ext" in info:
-                filename = f"{info['title']}.{info['ext']}"
-                return os.path.join(output_dir, filename)
+            cached_info = None if force_refresh else cache.get(_info_cache_key(url))
+            if cached_info:
+                path = _mp3_path(ydl.prepare_filename(cached_info))
+                if os.path.exists(path):
+                    return path
+            info: Optional[Dict[str, Any]] = ydl.extract_info(url, download=True)
+            if info:
+                _cache_info(url, info)
+                return _mp3_path(ydl.prepare_filename(info))
     except Exception as e:
         print(f"Error downloading video from {url}: {e}")
     return None
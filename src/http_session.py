@@ -0,0 +1,27 @@
+"""Shared HTTP session, so connections and TLS handshakes are reused across videos."""
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+POOL_SIZE = 16
+# Transient failures (dropped connections, rate limits, 5xx) are retried with
+# exponential backoff instead of failing the whole row.
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "POST"],
+)
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
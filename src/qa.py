@@ -1,86 +1,409 @@
 """Transcript sanitization and Q&A generation logic."""
 
-import json
+import asyncio
+import hashlib
 import os
 import re
-from typing import Dict, List
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from src.cache import CACHE_EXPIRE, cache
+
+if TYPE_CHECKING:
+    import tiktoken
 
 load_dotenv()
 
+SYSTEM_PROMPT = "You are a helpful assistant that creates quiz questions."
+DEFAULT_CONCURRENCY = 8
+MAX_OUTPUT_TOKENS = 1024
+# Transcripts are cut to fit the model context; long ones also cost the most latency.
+MAX_INPUT_TOKENS = 8000
+CONTEXT_TOKENS = int(os.getenv("OPENAI_CONTEXT_TOKENS", "16385"))
+PROMPT_OVERHEAD_TOKENS = 500
+# Below this many tokens per transcript a batch is split rather than sent.
+MIN_INPUT_TOKENS = 1000
+# Completion limit of the model (4096 for gpt-3.5-turbo), which caps batch sizes.
+MAX_COMPLETION_TOKENS = int(os.getenv("OPENAI_MAX_COMPLETION_TOKENS", "4096"))
+# Rough UTF-8 bytes per token, used when no tokenizer is available.
+BYTES_PER_TOKEN = 4
+# The OpenAI clients retry connection errors, 429 and 5xx with backoff themselves.
+MAX_RETRIES = 5
 
-def generate_qa_pairs(transcript: str, num_pairs: int = 5) -> List[Dict[str, str]]:
+
+def _get_settings() -> Optional[Tuple[str, str, str]]:
     """
-    Generate question-answer pairs for a transcript using the OpenAI Python client.
-    Returns a list of dicts: [{"question": ..., "answer": ...}, ...]
+    Read the OpenAI settings from the environment.
+    Returns:
+        (api_key, base_url, model), or None if no API key is configured or
+        OPENAI_CONTEXT_TOKENS is too small to fit a transcript.
     """
     api_url = os.getenv("OPENAI_API_URL", "http://api.openai.com/v1/chat/completions")
     api_key = os.getenv("OPENAI_API_KEY", "")
     model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     if not api_key:
         print("Warning: OPENAI_API_KEY not set. Skipping Q&A generation.")
-        return []
+        return None
+    if _input_budget(1) < MIN_INPUT_TOKENS:
+        print(
+            f"Warning: OPENAI_CONTEXT_TOKENS={CONTEXT_TOKENS} leaves fewer than "
+            f"{MIN_INPUT_TOKENS} tokens for a transcript. Skipping Q&A generation."
+        )
+        return None
+    return api_key, api_url.replace("/v1/chat/completions", ""), model
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str, base_url: str) -> OpenAI:
+    """Return a shared OpenAI client so its connection pool is reused across calls."""
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=MAX_RETRIES)
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """Return the tiktoken encoding for a model, or None if it cannot be loaded."""
+    import tiktoken
+
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Warning: could not load tokenizer for {model}: {e}")
+        return None
+
+
+def _input_budget(batch_size: int) -> int:
+    available = CONTEXT_TOKENS - MAX_OUTPUT_TOKENS * batch_size - PROMPT_OVERHEAD_TOKENS
+    return min(MAX_INPUT_TOKENS, available // batch_size)
+
+
+def max_input_tokens(batch_size: int = 1) -> int:
+    """
+    Token budget per transcript when batch_size transcripts share one prompt.
+    Returns:
+        min(MAX_INPUT_TOKENS, context left after the answers and prompt overhead).
+    Raises:
+        ValueError: If that leaves fewer than MIN_INPUT_TOKENS per transcript.
+    """
+    budget = _input_budget(batch_size)
+    if budget < MIN_INPUT_TOKENS:
+        raise ValueError(
+            f"A context of {CONTEXT_TOKENS} tokens leaves only {budget} tokens per "
+            f"transcript for a batch of {batch_size}; "
+            + (
+                "raise OPENAI_CONTEXT_TOKENS."
+                if batch_size == 1
+                else "use a smaller batch or raise OPENAI_CONTEXT_TOKENS."
+            )
+        )
+    return budget
+
+
+def max_batch_size() -> int:
+    """
+    Largest number of transcripts that fit in one prompt.
+    Returns:
+        The largest batch whose answers fit in MAX_COMPLETION_TOKENS and that
+        leaves at least MIN_INPUT_TOKENS per transcript; at least 1.
+    """
+    batch_size = 1
+    while (batch_size + 1) * MAX_OUTPUT_TOKENS <= MAX_COMPLETION_TOKENS and (
+        _input_budget(batch_size + 1) >= MIN_INPUT_TOKENS
+    ):
+        batch_size += 1
+    return batch_size
+
+
+def truncate_transcript(transcript: str, model: str, max_tokens: int) -> str:
+    """
+    Cut a transcript down to at most max_tokens tokens of the model's tokenizer.
+    Falls back to an estimate of BYTES_PER_TOKEN UTF-8 bytes per token if no tokenizer loads.
+    Args:
+        transcript: The transcript text.
+        model: Model name used to pick the tokenizer.
+        max_tokens: Maximum number of tokens to keep.
+    Returns:
+        The transcript, truncated if needed.
+    """
+    data = transcript.encode("utf-8")
+    # Every token covers at least one byte, so this many bytes always fit.
+    if len(data) <= max_tokens:
+        return transcript
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return data[: max_tokens * BYTES_PER_TOKEN].decode("utf-8", errors="ignore")
+    tokens = encoding.encode(transcript, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return transcript
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _qa_cache_key(transcript: str, model: str, num_pairs: int) -> Tuple[str, ...]:
+    digest = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+    return ("qa-pairs", digest, model, str(num_pairs))
+
+
+def _get_cached_qa_pairs(
+    transcript: str, model: str, num_pairs: int
+) -> Optional[List[Dict[str, str]]]:
+    return cache.get(_qa_cache_key(transcript, model, num_pairs))
+
+
+def _cache_qa_pairs(
+    transcript: str, model: str, num_pairs: int, qa_pairs: List[Dict[str, str]]
+) -> List[Dict[str, str]]:
+    """Cache a successful response so unchanged transcripts skip the API; returns qa_pairs."""
+    if qa_pairs:
+        cache.set(
+            _qa_cache_key(transcript, model, num_pairs),
+            qa_pairs,
+            expire=CACHE_EXPIRE,
+            tag="qa",
+        )
+    return qa_pairs
+
 
-    prompt = (
+def _build_prompt(transcript: str, num_pairs: int) -> str:
+    return (
         f"Given the following transcript, generate {num_pairs} question-answer pairs that test comprehension. "
         "Return them as a JSON list of objects with 'question' and 'answer' fields.\nTranscript:\n"
         f"{transcript}"
     )
 
-    client = OpenAI(
-        api_key=api_key, base_url=api_url.replace("/v1/chat/completions", "")
+
+def _build_batch_prompt(transcripts: List[str], num_pairs: int) -> str:
+    sections = "\n".join(
+        f"Transcript {i + 1}:\n{transcript}" for i, transcript in enumerate(transcripts)
+    )
+    return (
+        f"Given the following {len(transcripts)} transcripts, generate {num_pairs} question-answer pairs "
+        "for each that test comprehension. Return a JSON list of "
+        f"{len(transcripts)} lists, one per transcript in order, each a list of objects with "
+        f"'question' and 'answer' fields.\n{sections}"
     )
 
+
+def _build_messages(prompt: str) -> List[Any]:
+    from openai.types.chat import (
+        ChatCompletionSystemMessageParam,
+        ChatCompletionUserMessageParam,
+    )
+
+    return [
+        ChatCompletionSystemMessageParam(role="system", content=SYSTEM_PROMPT),
+        ChatCompletionUserMessageParam(role="user", content=prompt),
+    ]
+
+
+def _is_qa_list(value: Any) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(q, dict) and "question" in q and "answer" in q for q in value
+    )
+
+
+def _extract_json_list(content: str) -> Optional[List[Any]]:
+    """Parse content as a JSON list, falling back to the outermost [...] span."""
     try:
-        from openai.types.chat import (
-            ChatCompletionSystemMessageParam,
-            ChatCompletionUserMessageParam,
-        )
+        value = orjson.loads(content)
+        if isinstance(value, list):
+            return value
+    except Exception:
+        pass
+    match = re.search(r"\[.*\]", content, re.DOTALL)
+    if match:
+        try:
+            value = orjson.loads(match.group(0))
+            if isinstance(value, list):
+                return value
+        except Exception:
+            pass
+    return None
 
-        messages = [
-            ChatCompletionSystemMessageParam(
-                role="system",
-                content="You are a helpful assistant that creates quiz questions.",
-            ),
-            ChatCompletionUserMessageParam(role="user", content=prompt),
-        ]
+
+def _parse_qa_pairs(content: Optional[str]) -> List[Dict[str, str]]:
+    """Parse a model response into Q&A pairs, or [] if it is missing or malformed."""
+    if not content:
+        print("No content returned from model.")
+        return []
+    qa_pairs = _extract_json_list(content)
+    if qa_pairs is not None and _is_qa_list(qa_pairs):
+        return qa_pairs
+    print("Failed to parse Q&A pairs from model response.")
+    return []
+
+
+def generate_qa_pairs(transcript: str, num_pairs: int = 5) -> List[Dict[str, str]]:
+    """
+    Generate question-answer pairs for a transcript using the OpenAI Python client.
+    Returns a list of dicts: [{"question": ..., "answer": ...}, ...]
+    """
+    settings = _get_settings()
+    if settings is None:
+        return []
+    api_key, base_url, model = settings
+    cached = _get_cached_qa_pairs(transcript, model, num_pairs)
+    if cached is not None:
+        return cached
+    client = _get_client(api_key, base_url)
+    try:
+        prompt_transcript = truncate_transcript(transcript, model, max_input_tokens())
         completion = client.chat.completions.create(
             model=model,
-            messages=messages,
-            max_tokens=1024,
+            messages=_build_messages(_build_prompt(prompt_transcript, num_pairs)),
+            max_tokens=MAX_OUTPUT_TOKENS,
             temperature=0.7,
         )
-        content = completion.choices[0].message.content
-        if not content:
-            print("No content returned from model.")
-            return []
-        try:
-            qa_pairs = json.loads(content)
-            if isinstance(qa_pairs, list):
-                for q in qa_pairs:
-                    if not (isinstance(q, dict) and "question" in q and "answer" in q):
-                        raise ValueError("Malformed Q&A object")
-                return qa_pairs
-        except Exception:
-            pass
-
-        match = re.search(r"\[.*\]", content, re.DOTALL) if content else None
-        if match:
-            try:
-                qa_pairs = json.loads(match.group(0))
-                if isinstance(qa_pairs, list):
-                    for q in qa_pairs:
-                        if not (
-                            isinstance(q, dict) and "question" in q and "answer" in q
-                        ):
-                            raise ValueError("Malformed Q&A object")
-                    return qa_pairs
-            except Exception:
-                pass
-        print("Failed to parse Q&A pairs from model response.")
+        qa_pairs = _parse_qa_pairs(completion.choices[0].message.content)
+        return _cache_qa_pairs(transcript, model, num_pairs, qa_pairs)
+    except Exception as e:
+        print(f"Error generating Q&A pairs: {e}")
         return []
+
+
+async def a_generate_qa_pairs(
+    client: AsyncOpenAI, model: str, transcript: str, num_pairs: int = 5
+) -> List[Dict[str, str]]:
+    """
+    Async variant of generate_qa_pairs using a caller-provided AsyncOpenAI client.
+    Returns a list of dicts: [{"question": ..., "answer": ...}, ...]
+    """
+    cached = _get_cached_qa_pairs(transcript, model, num_pairs)
+    if cached is not None:
+        return cached
+    try:
+        prompt_transcript = truncate_transcript(transcript, model, max_input_tokens())
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=_build_messages(_build_prompt(prompt_transcript, num_pairs)),
+            max_tokens=MAX_OUTPUT_TOKENS,
+            temperature=0.7,
+        )
+        qa_pairs = _parse_qa_pairs(completion.choices[0].message.content)
+        return _cache_qa_pairs(transcript, model, num_pairs, qa_pairs)
     except Exception as e:
         print(f"Error generating Q&A pairs: {e}")
         return []
+
+
+async def a_generate_qa_pairs_batch(
+    client: AsyncOpenAI, model: str, transcripts: List[str], num_pairs: int = 5
+) -> List[List[Dict[str, str]]]:
+    """
+    Generate Q&A pairs for several transcripts with a single request.
+    Batches larger than max_batch_size() are split into several requests.
+    Falls back to one request per transcript if the batched response is malformed.
+    Returns one list of Q&A dicts per transcript, in order.
+    """
+    if len(transcripts) == 1:
+        return [await a_generate_qa_pairs(client, model, transcripts[0], num_pairs)]
+    limit = max_batch_size()
+    if len(transcripts) > limit:
+        chunks = await asyncio.gather(
+            *(
+                a_generate_qa_pairs_batch(
+                    client, model, transcripts[i : i + limit], num_pairs
+                )
+                for i in range(0, len(transcripts), limit)
+            )
+        )
+        return [qa_pairs for chunk in chunks for qa_pairs in chunk]
+    budget = max_input_tokens(len(transcripts))
+    prompt_transcripts = [truncate_transcript(t, model, budget) for t in transcripts]
+    try:
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=_build_messages(
+                _build_batch_prompt(prompt_transcripts, num_pairs)
+            ),
+            max_tokens=MAX_OUTPUT_TOKENS * len(transcripts),
+            temperature=0.7,
+        )
+        content = completion.choices[0].message.content or ""
+        batches = _extract_json_list(content)
+        if (
+            batches is not None
+            and len(batches) == len(transcripts)
+            and all(_is_qa_list(qa_pairs) for qa_pairs in batches)
+        ):
+            return [
+                _cache_qa_pairs(transcript, model, num_pairs, qa_pairs)
+                for transcript, qa_pairs in zip(transcripts, batches)
+            ]
+        print("Failed to parse batched Q&A pairs, retrying one transcript at a time.")
+    except Exception as e:
+        print(f"Error generating batched Q&A pairs: {e}")
+    return list(
+        await asyncio.gather(
+            *(a_generate_qa_pairs(client, model, t, num_pairs) for t in transcripts)
+        )
+    )
+
+
+@asynccontextmanager
+async def async_qa_client() -> AsyncIterator[Optional[Tuple[AsyncOpenAI, str]]]:
+    """
+    Open one AsyncOpenAI client to share across a run.
+    Yields:
+        (client, model), or None if no API key is configured.
+    """
+    settings = _get_settings()
+    if settings is None:
+        yield None
+        return
+    api_key, base_url, model = settings
+    async with AsyncOpenAI(
+        api_key=api_key, base_url=base_url, max_retries=MAX_RETRIES
+    ) as client:
+        yield client, model
+
+
+async def a_generate_qa_pairs_many(
+    client: AsyncOpenAI,
+    model: str,
+    transcripts: List[str],
+    num_pairs: int = 5,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = 1,
+) -> List[List[Dict[str, str]]]:
+    """
+    Generate Q&A pairs for many transcripts concurrently with a shared AsyncOpenAI client.
+    Duplicate transcripts are sent once and cached responses are reused.
+    Args:
+        client: Client opened with async_qa_client.
+        model: Model name.
+        transcripts: Transcripts to generate Q&A pairs for.
+        num_pairs: Number of Q&A pairs per transcript.
+        concurrency: Maximum number of requests in flight, to respect rate limits.
+        batch_size: Number of transcripts sent in a single prompt, capped at max_batch_size().
+    Returns:
+        One list of Q&A dicts per transcript, in order.
+    """
+    # Identical or previously answered transcripts never reach the API.
+    results: Dict[str, List[Dict[str, str]]] = {}
+    missing: List[str] = []
+    for transcript in dict.fromkeys(transcripts):
+        cached = _get_cached_qa_pairs(transcript, model, num_pairs)
+        if cached is not None:
+            results[transcript] = cached
+        else:
+            missing.append(transcript)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    batch_size = max(1, min(batch_size, max_batch_size()))
+    batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+
+    async def run(batch: List[str]) -> List[List[Dict[str, str]]]:
+        async with semaphore:
+            return await a_generate_qa_pairs_batch(client, model, batch, num_pairs)
+
+    generated = await asyncio.gather(*(run(batch) for batch in batches))
+    for batch, batch_qa_pairs in zip(batches, generated):
+        results.update(zip(batch, batch_qa_pairs))
+    return [results[transcript] for transcript in transcripts]
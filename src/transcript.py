@@ -1,21 +1,101 @@
 """YouTube transcript fetching logic."""
 
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import requests
+import zstandard
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from src.http_session import session
+
+if TYPE_CHECKING:
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+# Transcripts are plain text and compress several times over with zstd.
+TRANSCRIPT_SUFFIX = ".txt.zst"
+ZSTD_LEVEL = 10
+
+
+@lru_cache(maxsize=1)
+def _get_api() -> "YouTubeTranscriptApi":
+    """Return the shared transcript API client, backed by the pooled HTTP session."""
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    return YouTubeTranscriptApi(http_client=session)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a transcript fetch error is worth retrying."""
+    return isinstance(
+        exc,
+        (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.RetryError,
+        ),
+    )
+
+
+# The shared session already retries each request a few times with a short
+# backoff; once it gives up (RetryError for 429/5xx, ConnectionError or Timeout
+# when the network is down) the whole fetch is retried on a longer schedule.
+# HTTP 4xx failures (YouTubeRequestFailed) and errors such as TranscriptsDisabled
+# or InvalidVideoId are permanent and raised immediately.
+@retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(),
+    reraise=True,
+)
+def _request_transcript(video_id: str) -> str:
+    """Fetch a transcript from the YouTube Transcript API, retrying failed requests."""
+    transcript = _get_api().fetch(video_id, languages=["fr", "en"])
+    return " ".join(snippet.text for snippet in transcript)
 
 
 def get_video_transcript(video_id: str) -> Optional[str]:
     """
     Fetch the transcript for a YouTube video by its ID.
+    Not cached here: the pipeline saves each transcript to a file and reads that
+    file on later runs.
     Args:
         video_id: The YouTube video ID.
     Returns:
         The transcript as a string if available, else None.
     """
     try:
-        from youtube_transcript_api import YouTubeTranscriptApi
-
-        transcript = YouTubeTranscriptApi().fetch(video_id, languages=["fr", "en"])
-        return " ".join(snippet.text for snippet in transcript)
+        return _request_transcript(video_id)
     except Exception as e:
         print(f"Error fetching transcript for {video_id}: {e}")
         return None
+
+
+def write_transcript(path: str, transcript: str) -> None:
+    """
+    Save a transcript, zstd-compressed if the path ends in ".zst".
+    Args:
+        path: Destination file path.
+        transcript: Transcript text.
+    """
+    data = transcript.encode("utf-8")
+    if path.endswith(".zst"):
+        # Compressor objects are not thread-safe, so each call gets its own.
+        data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def read_transcript(path: str) -> str:
+    """
+    Load a transcript saved by write_transcript, or a legacy plain-text one.
+    Args:
+        path: Transcript file path.
+    Returns:
+        The transcript text.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8")
@@ -1,5 +1,9 @@
 """General text utilities for the project."""
 
+import re
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def sanitize_transcript(text: str) -> str:
     """
@@ -7,4 +11,4 @@ def sanitize_transcript(text: str) -> str:
     """
     if not text:
         return ""
-    return " ".join(text.split())
+    return _WHITESPACE_RE.sub(" ", text).strip()
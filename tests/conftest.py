@@ -1,6 +1,10 @@
 import os
 import sys
+import tempfile
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
+
+# Keep the on-disk cache out of the working tree while testing.
+os.environ.setdefault("YT_CACHE_DIR", tempfile.mkdtemp(prefix="yt-cache-"))
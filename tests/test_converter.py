@@ -1,8 +1,10 @@
 """Unit tests for converter module."""
 
+import subprocess
+
 import pytest
 
-from src.converter import mp4_to_mp3
+from src.converter import get_ffmpeg_exe, mp4_to_mp3
 
 
 def test_mp4_to_mp3_invalid_file(tmp_path):
@@ -11,3 +13,25 @@ def test_mp4_to_mp3_invalid_file(tmp_path):
     mp4_path.write_text("not a real video")
     with pytest.raises(Exception):
         mp4_to_mp3(str(mp4_path), str(mp3_path))
+
+
+def test_mp4_to_mp3_extracts_audio(tmp_path):
+    mp4_path = tmp_path / "tone.mp4"
+    mp3_path = tmp_path / "tone.mp3"
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=1",
+            "-c:a",
+            "aac",
+            str(mp4_path),
+        ],
+        check=True,
+    )
+    mp4_to_mp3(str(mp4_path), str(mp3_path))
+    assert mp3_path.stat().st_size > 0
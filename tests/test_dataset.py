@@ -1,8 +1,17 @@
 """Unit tests for dataset module."""
 
+import csv
 import os
 
-from src.dataset import write_dataset_csv
+import pyarrow.parquet as pq
+
+from src.dataset import (
+    DatasetWriter,
+    ParquetDatasetWriter,
+    open_dataset_writer,
+    parquet_to_csv,
+    write_dataset_csv,
+)
 
 
 def test_write_dataset_csv(tmp_path):
@@ -24,3 +33,42 @@ def test_write_dataset_csv(tmp_path):
     with open(result, encoding="utf-8") as f:
         content = f.read()
     assert "Test Video" in content
+
+
+def test_dataset_writer_streams_rows(tmp_path):
+    csv_path = tmp_path / "out" / "dataset.csv"
+    with DatasetWriter(str(csv_path)) as writer:
+        writer.write({"url": "https://youtu.be/a", "qa_pairs": '[{"question": "q"}]'})
+        writer.write({"url": "https://youtu.be/b", "transcript_exists": False})
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["url"] for row in rows] == ["https://youtu.be/a", "https://youtu.be/b"]
+    assert rows[0]["qa_pairs"] == '[{"question": "q"}]'
+    assert rows[1]["transcript_exists"] == "False"
+    assert rows[1]["title"] == ""
+
+
+def test_parquet_dataset_round_trip(tmp_path):
+    rows = [
+        {"url": f"https://youtu.be/{i}", "transcript_exists": i % 2 == 0}
+        for i in range(5)
+    ]
+    parquet_path = tmp_path / "out" / "dataset.parquet"
+    with ParquetDatasetWriter(str(parquet_path), row_group_size=2) as writer:
+        for row in rows:
+            writer.write(row)
+    assert pq.ParquetFile(parquet_path).metadata.num_row_groups == 3
+
+    csv_path = parquet_to_csv(str(parquet_path), str(tmp_path / "dataset.csv"))
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        csv_rows = list(csv.DictReader(f))
+    assert [row["url"] for row in csv_rows] == [row["url"] for row in rows]
+    assert csv_rows[1]["transcript_exists"] == "False"
+    assert csv_rows[1]["title"] == ""
+
+
+def test_open_dataset_writer_picks_format(tmp_path):
+    assert isinstance(
+        open_dataset_writer(str(tmp_path / "d.parquet")), ParquetDatasetWriter
+    )
+    assert isinstance(open_dataset_writer(str(tmp_path / "d.csv")), DatasetWriter)
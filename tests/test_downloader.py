@@ -1,6 +1,14 @@
 """Unit tests for downloader module."""
 
-from src.downloader import get_video_id
+from src.cache import cache
+from src.downloader import (
+    _info_cache_key,
+    get_legacy_stems,
+    get_video_id,
+    index_downloads,
+    index_legacy_downloads,
+    split_filename,
+)
 
 
 def test_get_video_id_youtube_url():
@@ -16,3 +24,53 @@ def test_get_video_id_short_url():
 def test_get_video_id_invalid_url():
     url = "https://example.com/"
     assert get_video_id(url) is None
+
+
+def test_split_filename():
+    assert split_filename("out/My Video [dQw4w9WgXcQ].mp4") == (
+        "My Video",
+        "dQw4w9WgXcQ",
+    )
+    assert split_filename("out/legacy.mp4") == ("legacy", None)
+
+
+def test_index_downloads(tmp_path):
+    (tmp_path / "A [dQw4w9WgXcQ].mp4").write_text("")
+    (tmp_path / "A [dQw4w9WgXcQ].mp3").write_text("")
+    (tmp_path / "legacy dQw4w9WgXcQ.mp4").write_text("")
+    assert index_downloads(str(tmp_path), ".mp4") == {
+        "dQw4w9WgXcQ": str(tmp_path / "A [dQw4w9WgXcQ].mp4")
+    }
+
+
+def test_get_video_id_extra_query_params():
+    url = "https://www.youtube.com/watch?list=PL123&v=dQw4w9WgXcQ&t=42s"
+    assert get_video_id(url) == "dQw4w9WgXcQ"
+    assert get_video_id("https://youtu.be/dQw4w9WgXcQ?si=abc") == "dQw4w9WgXcQ"
+
+
+def test_index_downloads_multi_part_extension(tmp_path):
+    (tmp_path / "A. B [dQw4w9WgXcQ].txt.zst").write_text("")
+    assert index_downloads(str(tmp_path), ".txt.zst") == {
+        "dQw4w9WgXcQ": str(tmp_path / "A. B [dQw4w9WgXcQ].txt.zst")
+    }
+    assert index_downloads(str(tmp_path), ".txt") == {}
+
+
+def test_index_legacy_downloads(tmp_path):
+    (tmp_path / "A [dQw4w9WgXcQ].mp4").write_text("")
+    (tmp_path / "Old title.mp4").write_text("")
+    assert index_legacy_downloads(str(tmp_path), ".mp4") == {
+        "Old title": str(tmp_path / "Old title.mp4")
+    }
+    assert index_legacy_downloads(str(tmp_path / "missing"), ".mp4") == {}
+
+
+def test_get_legacy_stems_from_cached_info():
+    url = "https://youtu.be/dQw4w9WgXcQ"
+    info = {"id": "dQw4w9WgXcQ", "title": "Q: A?", "ext": "webm"}
+    cache.set(_info_cache_key(url), info)
+    try:
+        assert get_legacy_stems(url) == ("Q： A？", "Q: A?")
+    finally:
+        cache.delete(_info_cache_key(url))
@@ -0,0 +1,275 @@
+"""Unit tests for the main pipeline orchestrator."""
+
+import asyncio
+import csv
+import gc
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+import main
+
+
+@asynccontextmanager
+async def fake_qa_client():
+    yield object(), "model"
+
+
+async def fake_generate_qa_pairs(client, model, transcripts, **kwargs):
+    return [[{"question": t, "answer": t}] for t in transcripts]
+
+
+def test_process_videos_from_csv(tmp_path, monkeypatch):
+    def fake_download(url, output_dir):
+        video_id = url.rsplit("=", 1)[-1]
+        path = f"{output_dir}/Title {video_id} [{video_id}].mp3"
+        open(path, "w").close()
+        return path
+
+    def fail_convert(mp4_path, mp3_path):
+        raise AssertionError("downloaded audio should not be converted")
+
+    monkeypatch.setattr(main, "download_video", fake_download)
+    monkeypatch.setattr(main, "mp4_to_mp3", fail_convert)
+    monkeypatch.setattr(main, "get_video_transcript", lambda video_id: video_id)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    monkeypatch.setattr(main, "a_generate_qa_pairs_many", fake_generate_qa_pairs)
+
+    csv_path = tmp_path / "videos.csv"
+    ids = [f"vid{i:08d}" for i in range(10)]
+    csv_path.write_text(
+        "url\n" + "".join(f"https://www.youtube.com/watch?v={i}\n" for i in ids)
+    )
+    result = main.process_videos_from_csv(
+        csv_path=str(csv_path),
+        video_output_dir=str(tmp_path / "mp4"),
+        audio_output_dir=str(tmp_path / "mp3"),
+        transcript_output_dir=str(tmp_path / "transcripts"),
+        dataset_path=str(tmp_path / "out" / "dataset.csv"),
+        qa_batch_size=3,
+    )
+    with open(result, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(row["video_id"] for row in rows) == ids
+    assert all(row["transcript_exists"] == "True" for row in rows)
+    assert all(row["mp4_path"] == "" for row in rows)
+    for row in rows:
+        video_id = row["video_id"]
+        assert row["title"] == f"Title {video_id}"
+        assert json.loads(row["qa_pairs"]) == [
+            {"question": video_id, "answer": video_id}
+        ]
+
+
+def test_process_videos_from_csv_reuses_legacy_files(tmp_path, monkeypatch):
+    def fail_download(url, output_dir):
+        raise AssertionError("legacy video should not be downloaded")
+
+    monkeypatch.setattr(main, "download_video", fail_download)
+    monkeypatch.setattr(main, "mp4_to_mp3", lambda mp4, mp3: open(mp3, "w").close())
+
+    def fail_transcript(video_id):
+        raise AssertionError("saved transcript should not be fetched")
+
+    monkeypatch.setattr(main, "get_video_transcript", fail_transcript)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    monkeypatch.setattr(main, "a_generate_qa_pairs_many", fake_generate_qa_pairs)
+
+    mp4_dir = tmp_path / "mp4"
+    mp4_dir.mkdir()
+    (mp4_dir / "Cached [dQw4w9WgXcQ].mp4").write_text("")
+    transcript_dir = tmp_path / "transcripts"
+    transcript_dir.mkdir()
+    (transcript_dir / "Cached [dQw4w9WgXcQ].txt").write_text("legacy  text")
+    csv_path = tmp_path / "videos.csv"
+    existing_qa_pairs = [{"question": "Qui ?", "answer": "Moi"}]
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "qa_pairs"])
+        writer.writerow(["https://youtu.be/dQw4w9WgXcQ", json.dumps(existing_qa_pairs)])
+    result = main.process_videos_from_csv(
+        csv_path=str(csv_path),
+        video_output_dir=str(mp4_dir),
+        audio_output_dir=str(tmp_path / "mp3"),
+        transcript_output_dir=str(transcript_dir),
+        dataset_path=str(tmp_path / "out" / "dataset.csv"),
+    )
+    with open(result, encoding="utf-8") as f:
+        (row,) = list(csv.DictReader(f))
+    assert row["transcript"] == "legacy text"
+    assert json.loads(row["qa_pairs"]) == existing_qa_pairs
+    assert row["title"] == "Cached"
+    assert row["mp4_path"].endswith("Cached [dQw4w9WgXcQ].mp4")
+    assert row["mp3_path"].endswith("Cached [dQw4w9WgXcQ].mp3")
+    assert os.path.exists(row["mp3_path"])
+
+
+def test_process_videos_from_csv_matches_files_named_by_title(tmp_path, monkeypatch):
+    def fail_download(url, output_dir):
+        raise AssertionError("video saved by title should not be downloaded")
+
+    def fail_transcript(video_id):
+        raise AssertionError("transcript saved by title should not be fetched")
+
+    lookups = []
+
+    def fake_legacy_stems(url):
+        lookups.append(url)
+        return ("Old：Title", "Old:Title")
+
+    monkeypatch.setattr(main, "download_video", fail_download)
+    monkeypatch.setattr(main, "mp4_to_mp3", lambda mp4, mp3: open(mp3, "w").close())
+    monkeypatch.setattr(main, "get_video_transcript", fail_transcript)
+    monkeypatch.setattr(main, "get_legacy_stems", fake_legacy_stems)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    monkeypatch.setattr(main, "a_generate_qa_pairs_many", fake_generate_qa_pairs)
+
+    mp4_dir = tmp_path / "mp4"
+    mp4_dir.mkdir()
+    (mp4_dir / "Old：Title.mp4").write_text("")
+    (mp4_dir / "Other.mp4").write_text("")
+    transcript_dir = tmp_path / "transcripts"
+    transcript_dir.mkdir()
+    (transcript_dir / "Old:Title.txt").write_text("old text")
+    csv_path = tmp_path / "videos.csv"
+    csv_path.write_text("url\n" + "https://youtu.be/dQw4w9WgXcQ\n" * 2)
+    result = main.process_videos_from_csv(
+        csv_path=str(csv_path),
+        video_output_dir=str(mp4_dir),
+        audio_output_dir=str(tmp_path / "mp3"),
+        transcript_output_dir=str(transcript_dir),
+        dataset_path=str(tmp_path / "out" / "dataset.csv"),
+    )
+    with open(result, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    for row in rows:
+        assert row["title"] == "Old：Title"
+        assert row["mp4_path"].endswith("Old：Title.mp4")
+        assert row["mp3_path"].endswith("Old：Title.mp3")
+        assert row["transcript"] == "old text"
+    assert lookups == ["https://youtu.be/dQw4w9WgXcQ"]
+
+
+def test_process_videos_from_csv_shares_work_for_repeated_videos(tmp_path, monkeypatch):
+    downloads = []
+    fetches = []
+    lock = threading.Lock()
+
+    def slow_download(url, output_dir):
+        with lock:
+            downloads.append(url)
+        time.sleep(0.05)
+        path = f"{output_dir}/Same [dQw4w9WgXcQ].mp3"
+        open(path, "w").close()
+        return path
+
+    def slow_transcript(video_id):
+        with lock:
+            fetches.append(video_id)
+        time.sleep(0.05)
+        return "same text"
+
+    monkeypatch.setattr(main, "download_video", slow_download)
+    monkeypatch.setattr(main, "get_video_transcript", slow_transcript)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    monkeypatch.setattr(main, "a_generate_qa_pairs_many", fake_generate_qa_pairs)
+
+    csv_path = tmp_path / "videos.csv"
+    csv_path.write_text("url\n" + "https://youtu.be/dQw4w9WgXcQ\n" * 4)
+    result = main.process_videos_from_csv(
+        csv_path=str(csv_path),
+        video_output_dir=str(tmp_path / "mp4"),
+        audio_output_dir=str(tmp_path / "mp3"),
+        transcript_output_dir=str(tmp_path / "transcripts"),
+        dataset_path=str(tmp_path / "out" / "dataset.csv"),
+    )
+    with open(result, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert all(row["transcript"] == "same text" for row in rows)
+    assert len(downloads) == 1
+    assert fetches == ["dQw4w9WgXcQ"]
+
+
+def test_process_videos_from_csv_writer_failure_stops_stages(
+    tmp_path, monkeypatch, caplog
+):
+    monkeypatch.setattr(main, "download_video", lambda url, output_dir: None)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    csv_path = tmp_path / "videos.csv"
+    csv_path.write_text("url\nhttps://youtu.be/dQw4w9WgXcQ\n")
+    dataset_path = tmp_path / "out" / "dataset.csv"
+    dataset_path.mkdir(parents=True)
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        with pytest.raises(IsADirectoryError):
+            main.process_videos_from_csv(
+                csv_path=str(csv_path),
+                video_output_dir=str(tmp_path / "mp4"),
+                audio_output_dir=str(tmp_path / "mp3"),
+                transcript_output_dir=str(tmp_path / "transcripts"),
+                dataset_path=str(dataset_path),
+            )
+        gc.collect()
+    assert "never retrieved" not in caplog.text
+
+
+def test_process_videos_from_csv_fills_large_qa_batches(tmp_path, monkeypatch):
+    batch_sizes = []
+
+    async def record_batches(client, model, transcripts, **kwargs):
+        batch_sizes.append(len(transcripts))
+        if len(batch_sizes) == 1:
+            # Let the remaining rows pile up behind the first request.
+            await asyncio.sleep(0.2)
+        return await fake_generate_qa_pairs(client, model, transcripts)
+
+    def fake_download(url, output_dir):
+        video_id = url.rsplit("=", 1)[-1]
+        path = f"{output_dir}/Title [{video_id}].mp3"
+        open(path, "w").close()
+        return path
+
+    monkeypatch.setattr(main, "download_video", fake_download)
+    monkeypatch.setattr(main, "get_video_transcript", lambda video_id: video_id)
+    monkeypatch.setattr(main, "async_qa_client", fake_qa_client)
+    monkeypatch.setattr(main, "a_generate_qa_pairs_many", record_batches)
+
+    csv_path = tmp_path / "videos.csv"
+    ids = [f"vid{i:08d}" for i in range(8)]
+    csv_path.write_text(
+        "url\n" + "".join(f"https://www.youtube.com/watch?v={i}\n" for i in ids)
+    )
+    main.process_videos_from_csv(
+        csv_path=str(csv_path),
+        video_output_dir=str(tmp_path / "mp4"),
+        audio_output_dir=str(tmp_path / "mp3"),
+        transcript_output_dir=str(tmp_path / "transcripts"),
+        dataset_path=str(tmp_path / "out" / "dataset.csv"),
+        qa_workers=1,
+        qa_batch_size=8,
+    )
+    assert batch_sizes == [1, 7]
+
+
+def test_count_csv_rows_skips_blank_lines(tmp_path):
+    csv_path = tmp_path / "videos.csv"
+    csv_path.write_text("url\nhttps://youtu.be/a\n\nhttps://youtu.be/b\n\n\n")
+    assert main._count_csv_rows(str(csv_path)) == 2
+
+
+def test_is_qa_pairs_valid():
+    def valid(qa_pairs_str):
+        return main.is_qa_pairs_valid(main.load_qa_pairs(qa_pairs_str))
+
+    assert valid('[{"question": "q", "answer": "a"}]')
+    assert not valid("")
+    assert not valid("[]")
+    assert not valid("[{")
+    assert not valid('[{"question": "q"}]')
+    assert not valid('{"question": "q", "answer": "a"}')
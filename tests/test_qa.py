@@ -0,0 +1,126 @@
+"""Unit tests for qa module."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import qa as qa_module
+from src.cache import cache
+from src.qa import (
+    MIN_INPUT_TOKENS,
+    _cache_qa_pairs,
+    a_generate_qa_pairs,
+    a_generate_qa_pairs_batch,
+    a_generate_qa_pairs_many,
+    async_qa_client,
+    generate_qa_pairs,
+    max_batch_size,
+    max_input_tokens,
+    truncate_transcript,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class FakeAsyncClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        message = SimpleNamespace(content=self.responses.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def qa(text):
+    return [{"question": text, "answer": text}]
+
+
+def test_generate_qa_pairs_batch_single_request():
+    client = FakeAsyncClient([json.dumps([qa("a"), qa("b")])])
+    result = asyncio.run(a_generate_qa_pairs_batch(client, "model", ["t1", "t2"]))
+    assert result == [qa("a"), qa("b")]
+    assert len(client.prompts) == 1
+
+
+def test_generate_qa_pairs_batch_falls_back_per_transcript():
+    client = FakeAsyncClient(["not json", json.dumps(qa("a")), json.dumps(qa("b"))])
+    result = asyncio.run(a_generate_qa_pairs_batch(client, "model", ["t1", "t2"]))
+    assert result == [qa("a"), qa("b")]
+    assert len(client.prompts) == 3
+
+
+def test_async_qa_client_without_api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+
+    async def open_client():
+        async with async_qa_client() as qa_client:
+            return qa_client
+
+    assert asyncio.run(open_client()) is None
+
+
+def test_generate_qa_pairs_many_reuses_cached_responses():
+    _cache_qa_pairs("t1", "model", 5, qa("a"))
+    _cache_qa_pairs("t2", "model", 5, qa("b"))
+    client = FakeAsyncClient([])
+    result = asyncio.run(a_generate_qa_pairs_many(client, "model", ["t1", "t2", "t1"]))
+    assert result == [qa("a"), qa("b"), qa("a")]
+    assert client.prompts == []
+
+
+def test_truncate_transcript():
+    transcript = "word " * 1000
+    truncated = truncate_transcript(transcript, "gpt-3.5-turbo", 50)
+    assert transcript.startswith(truncated)
+    assert len(truncated) < len(transcript)
+    assert truncate_transcript("short", "gpt-3.5-turbo", 50) == "short"
+
+
+def test_truncate_transcript_counts_multibyte_characters(monkeypatch):
+    class ByteEncoding:
+        def encode(self, text, disallowed_special=()):
+            return list(text.encode("utf-8"))
+
+        def decode(self, tokens):
+            return bytes(tokens).decode("utf-8", errors="ignore")
+
+    monkeypatch.setattr(qa_module, "_get_encoding", lambda model: ByteEncoding())
+    transcript = "字" * 100
+    truncated = truncate_transcript(transcript, "model", 150)
+    assert truncated == "字" * 50
+
+
+def test_max_input_tokens_rejects_tiny_budgets(monkeypatch):
+    monkeypatch.setattr(qa_module, "CONTEXT_TOKENS", 4096)
+    assert max_input_tokens(1) >= MIN_INPUT_TOKENS
+    with pytest.raises(ValueError):
+        max_input_tokens(4)
+    assert max_batch_size() == 1
+
+
+def test_generate_qa_pairs_batch_splits_oversized_batches():
+    limit = max_batch_size()
+    transcripts = [f"t{i}" for i in range(limit + 1)]
+    client = FakeAsyncClient(
+        [json.dumps([qa(t) for t in transcripts[:limit]]), json.dumps(qa("last"))]
+    )
+    result = asyncio.run(a_generate_qa_pairs_batch(client, "model", transcripts))
+    assert result == [qa(t) for t in transcripts[:limit]] + [qa("last")]
+    assert len(client.prompts) == 2
+
+
+def test_too_small_context_skips_qa_generation(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(qa_module, "CONTEXT_TOKENS", 2000)
+    assert generate_qa_pairs("hello " * 10) == []
+    client = FakeAsyncClient([])
+    assert asyncio.run(a_generate_qa_pairs(client, "model", "hello " * 10)) == []
+    assert client.prompts == []
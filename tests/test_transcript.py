@@ -1,7 +1,95 @@
 """Unit tests for transcript module."""
 
-from src.transcript import get_video_transcript
+import os
+from types import SimpleNamespace
 
+import pytest
+import requests
+from tenacity import stop_after_attempt, wait_none
+from youtube_transcript_api import TranscriptsDisabled, YouTubeRequestFailed
 
-def test_get_video_transcript_invalid_id():
+from src import http_session, transcript
+from src.transcript import (
+    TRANSCRIPT_SUFFIX,
+    get_video_transcript,
+    read_transcript,
+    write_transcript,
+)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transcript._request_transcript.retry, "wait", wait_none())
+
+
+def test_get_video_transcript_invalid_id(monkeypatch):
+    # Whether or not the network is up, this should fail without retrying.
+    monkeypatch.setattr(http_session.RETRY, "total", 0)
+    monkeypatch.setattr(
+        transcript._request_transcript.retry, "stop", stop_after_attempt(1)
+    )
     assert get_video_transcript("invalid_id_123456") is None
+
+
+def test_get_video_transcript_joins_snippets(monkeypatch):
+    calls = []
+
+    class FakeApi:
+        def fetch(self, video_id, languages):
+            calls.append(video_id)
+            return [SimpleNamespace(text="hello"), SimpleNamespace(text="world")]
+
+    monkeypatch.setattr(transcript, "_get_api", FakeApi)
+    assert get_video_transcript("somevideo01") == "hello world"
+    assert calls == ["somevideo01"]
+
+
+def test_get_video_transcript_retries_transient_errors(monkeypatch, no_backoff):
+    calls = []
+
+    class FlakyApi:
+        def fetch(self, video_id, languages):
+            calls.append(video_id)
+            if len(calls) == 1:
+                raise requests.exceptions.RetryError("too many 503 error responses")
+            if len(calls) == 2:
+                raise requests.exceptions.ConnectionError("connection reset")
+            return [SimpleNamespace(text="hello")]
+
+    monkeypatch.setattr(transcript, "_get_api", FlakyApi)
+    assert get_video_transcript("flakyvid001") == "hello"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        TranscriptsDisabled("disabled001"),
+        YouTubeRequestFailed("disabled001", requests.HTTPError("404 Not Found")),
+    ],
+)
+def test_get_video_transcript_does_not_retry_permanent_errors(monkeypatch, error):
+    calls = []
+
+    class FailingApi:
+        def fetch(self, video_id, languages):
+            calls.append(video_id)
+            raise error
+
+    monkeypatch.setattr(transcript, "_get_api", FailingApi)
+    assert get_video_transcript("disabled001") is None
+    assert calls == ["disabled001"]
+
+
+def test_write_and_read_transcript(tmp_path):
+    path = str(tmp_path / f"video{TRANSCRIPT_SUFFIX}")
+    text = "bonjour le monde " * 100
+    write_transcript(path, text)
+    assert os.path.getsize(path) < len(text)
+    assert read_transcript(path) == text
+
+
+def test_read_legacy_transcript(tmp_path):
+    path = tmp_path / "video.txt"
+    path.write_text("hello world", encoding="utf-8")
+    assert read_transcript(str(path)) == "hello world"
@@ -0,0 +1,11 @@
+"""Unit tests for utils module."""
+
+from src.utils import sanitize_transcript
+
+
+def test_sanitize_transcript_collapses_whitespace():
+    assert sanitize_transcript("  hello\n\n world\t again ") == "hello world again"
+
+
+def test_sanitize_transcript_empty():
+    assert sanitize_transcript("") == ""